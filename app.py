@@ -1,20 +1,29 @@
 # app.py
+import atexit
 import os
+import concurrent.futures
+import pickle
+import posixpath
+import queue
+import re
 import threading
-import time
-import random
+import secrets
 import smtplib
+import zipfile
+import xml.etree.ElementTree as ET
 from email.mime.text import MIMEText
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, time as dt_time, timedelta, timezone
 from pathlib import Path
 from urllib.parse import unquote
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request
 from flask_cors import CORS
 from flask_bcrypt import Bcrypt
+from bson import ObjectId
 from pymongo import MongoClient
+from pymongo.errors import DuplicateKeyError, OperationFailure, PyMongoError
 from dotenv import load_dotenv
-import openpyxl
+import orjson
 
 # -------------------------------
 # Load env
@@ -25,6 +34,9 @@ app = Flask(__name__)
 CORS(app)
 bcrypt = Bcrypt(app)
 
+# bcrypt releases the GIL, so hashing on a pool lets other requests run
+HASH_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=os.cpu_count() or 1)
+
 # -------------------------------
 # MongoDB setup
 # -------------------------------
@@ -34,11 +46,65 @@ db = client.get_database("coinsora")
 users = db["users"]
 pending_users = db["pending_users"]
 
+def ensure_indexes():
+    # Runs in the background and only logs failures: an unreachable MongoDB
+    # (or duplicate contacts blocking the unique index) must not keep the
+    # app, and its Mongo-free catalog routes, from starting
+    indexes = [
+        (users, "contact", {"unique": True}),
+        # Backs the atomic one-record-per-contact upsert in save_pending_otp
+        (pending_users, "contact", {"unique": True}),
+        # MongoDB's TTL monitor removes pending OTPs once otp_expiry has passed
+        (pending_users, "otp_expiry", {"expireAfterSeconds": 0}),
+    ]
+    for collection, keys, options in indexes:
+        try:
+            collection.create_index(keys, **options)
+        except PyMongoError:
+            app.logger.exception("Could not create index %s on %s", keys, collection.name)
+
+    # Superseded by the unique pending_users.contact index
+    try:
+        pending_users.drop_index("contact_1_login_otp_1")
+    except OperationFailure as e:
+        # 27 = IndexNotFound: already dropped, or never created
+        if e.code != 27:
+            app.logger.exception("Could not drop index contact_1_login_otp_1 on pending_users")
+    except PyMongoError:
+        app.logger.exception("Could not drop index contact_1_login_otp_1 on pending_users")
+
+threading.Thread(target=ensure_indexes, daemon=True).start()
+
+def save_pending_otp(contact, record):
+    # Replaces any earlier signup/login OTP for this contact. If two
+    # concurrent upserts both miss and insert, the unique index rejects
+    # one; its retry then finds and replaces the winner's record.
+    try:
+        pending_users.replace_one({"contact": contact}, record, upsert=True)
+    except DuplicateKeyError:
+        pending_users.replace_one({"contact": contact}, record, upsert=True)
+
 # -------------------------------
 # Email setup (Gmail SMTP)
 # -------------------------------
 EMAIL_ADDRESS = os.getenv("EMAIL_ADDRESS")
 EMAIL_PASSWORD = os.getenv("EMAIL_PASSWORD")
+SMTP_HOST = "smtp.gmail.com"
+SMTP_PORT = 465
+
+SMTP_KEEPALIVE_SECONDS = 60
+# Bounds every connect/NOOP/send so a stalled server raises (and we
+# reconnect) instead of wedging the email worker with _smtp_lock held
+SMTP_TIMEOUT_SECONDS = 30
+
+# One logged-in connection is reused across sends instead of a TLS
+# handshake + AUTH per OTP. The email worker is its only regular user;
+# the lock just keeps shutdown from closing it mid-send.
+_smtp_lock = threading.Lock()
+_smtp_conn = None
+
+# (recipient, otp, login_otp) tuples waiting to be emailed
+EMAIL_QUEUE = queue.Queue()
 
 # -------------------------------
 # Excel config
@@ -51,6 +117,90 @@ EXCEL_PATH = BASE_DIR / "storage.xlsx"
 # -------------------------------
 DEFAULT_PROFILE_PIC = "https://i.pravatar.cc/150?img=12"
 
+# -------------------------------
+# Helper: OTP generation
+# -------------------------------
+def generate_otp():
+    # OS CSPRNG, not the predictable Mersenne Twister behind `random`
+    return f"{secrets.randbelow(900000) + 100000:06d}"
+
+# -------------------------------
+# Helper: JSON responses
+# -------------------------------
+def _json_default(o):
+    # Flask's default has no case for times of day (time-only Excel cells)
+    if isinstance(o, dt_time):
+        return o.isoformat()
+    return app.json.default(o)
+
+def dump_json(data):
+    # Same output as jsonify: sorted keys, and dates/datetimes (date-styled
+    # cells) are passed through to Flask's JSON default so they keep the
+    # HTTP-date format rather than orjson's ISO 8601; that default also
+    # covers Decimal and the other types jsonify accepted
+    return orjson.dumps(
+        data,
+        default=_json_default,
+        option=orjson.OPT_SORT_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+    )
+
+def ojson(data, status=200):
+    # orjson encodes straight to bytes, much faster than Flask's jsonify
+    return Response(dump_json(data), status=status, mimetype="application/json")
+
+# -------------------------------
+# Helper: SMTP connection
+# -------------------------------
+def _close_smtp():
+    # Caller must hold _smtp_lock
+    global _smtp_conn
+    if _smtp_conn is None:
+        return
+    try:
+        _smtp_conn.quit()
+    except (smtplib.SMTPException, OSError):
+        pass
+    _smtp_conn = None
+
+def get_smtp():
+    # Caller must hold _smtp_lock
+    global _smtp_conn
+    if _smtp_conn is not None:
+        try:
+            if _smtp_conn.noop()[0] == 250:
+                return _smtp_conn
+        except (smtplib.SMTPException, OSError):
+            pass
+        _close_smtp()
+
+    conn = smtplib.SMTP_SSL(SMTP_HOST, SMTP_PORT, timeout=SMTP_TIMEOUT_SECONDS)
+    try:
+        conn.login(EMAIL_ADDRESS, EMAIL_PASSWORD)
+    except Exception:
+        conn.close()
+        raise
+    _smtp_conn = conn
+    return conn
+
+def keep_smtp_alive():
+    # Gmail drops idle sessions; a NOOP keeps ours open between sends
+    with _smtp_lock:
+        if _smtp_conn is None:
+            return
+        try:
+            _smtp_conn.noop()
+        except (smtplib.SMTPException, OSError):
+            _close_smtp()
+
+def shutdown_smtp():
+    if _smtp_lock.acquire(timeout=5):
+        try:
+            _close_smtp()
+        finally:
+            _smtp_lock.release()
+
+atexit.register(shutdown_smtp)
+
 # -------------------------------
 # Helper: Send Email OTP
 # -------------------------------
@@ -63,20 +213,39 @@ def send_email_otp(recipient, otp):
     msg["From"] = EMAIL_ADDRESS
     msg["To"] = recipient
 
-    with smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
-        server.login(EMAIL_ADDRESS, EMAIL_PASSWORD)
-        server.send_message(msg)
+    with _smtp_lock:
+        conn = get_smtp()
+        try:
+            conn.send_message(msg)
+        except (smtplib.SMTPServerDisconnected, OSError):
+            _close_smtp()
+            raise
 
 # -------------------------------
-# Cleanup expired OTPs (background)
+# Email worker (background)
 # -------------------------------
-def clean_expired_otps():
+def email_worker():
     while True:
-        now = datetime.now(timezone.utc)
-        pending_users.delete_many({"otp_expiry": {"$lt": now}})
-        time.sleep(60)
-
-threading.Thread(target=clean_expired_otps, daemon=True).start()
+        try:
+            recipient, otp, login_otp = EMAIL_QUEUE.get(timeout=SMTP_KEEPALIVE_SECONDS)
+        except queue.Empty:
+            keep_smtp_alive()
+            continue
+
+        try:
+            send_email_otp(recipient, otp)
+        except Exception:
+            app.logger.exception("Failed to send OTP to %s", recipient)
+            if not login_otp:
+                # Same as a failed synchronous send: the signup has to start over
+                try:
+                    pending_users.delete_one({"contact": recipient, "otp": otp})
+                except Exception:
+                    app.logger.exception("Failed to discard pending signup for %s", recipient)
+        finally:
+            EMAIL_QUEUE.task_done()
+
+threading.Thread(target=email_worker, daemon=True).start()
 
 # -------------------------------
 # AUTH ROUTES
@@ -90,18 +259,16 @@ def signup():
     password = data.get("password")
 
     if not name or not contact or not password:
-        return jsonify({"error": "Missing required fields (name, contact, password)"}), 400
+        return ojson({"error": "Missing required fields (name, contact, password)"}, 400)
 
-    if users.find_one({"contact": contact}):
-        return jsonify({"error": "User already exists"}), 400
+    if users.find_one({"contact": contact}, {"_id": 1}):
+        return ojson({"error": "User already exists"}, 400)
 
-    otp = str(random.randint(100000, 999999))
+    otp = generate_otp()
     expiry = datetime.now(timezone.utc) + timedelta(minutes=5)
-    hashed_pw = bcrypt.generate_password_hash(password).decode("utf-8")
+    hashed_pw = HASH_POOL.submit(bcrypt.generate_password_hash, password).result().decode("utf-8")
 
-    pending_users.delete_many({"contact": contact})
-
-    pending_users.insert_one({
+    save_pending_otp(contact, {
         "name": name,
         "contact": contact,
         "method": "email",
@@ -111,12 +278,8 @@ def signup():
         "login_otp": False
     })
 
-    try:
-        send_email_otp(contact, otp)
-        return jsonify({"message": "Signup OTP sent to email"}), 200
-    except Exception as e:
-        pending_users.delete_one({"contact": contact})
-        return jsonify({"error": f"Failed to send OTP: {str(e)}"}), 500
+    EMAIL_QUEUE.put((contact, otp, False))
+    return ojson({"message": "Signup OTP sent to email"}, 200)
 
 @app.route("/verify-otp", methods=["POST"])
 def verify_otp():
@@ -124,9 +287,12 @@ def verify_otp():
     contact = data.get("contact")
     otp = data.get("otp")
 
-    record = pending_users.find_one({"contact": contact, "login_otp": False})
+    record = pending_users.find_one(
+        {"contact": contact, "login_otp": False},
+        {"name": 1, "contact": 1, "password": 1, "otp": 1, "otp_expiry": 1},
+    )
     if not record:
-        return jsonify({"error": "No OTP request found"}), 404
+        return ojson({"error": "No OTP request found"}, 404)
 
     now = datetime.now(timezone.utc)
     otp_expiry = record["otp_expiry"]
@@ -135,23 +301,31 @@ def verify_otp():
 
     if now > otp_expiry:
         pending_users.delete_one({"contact": contact})
-        return jsonify({"error": "OTP expired. Please sign up again."}), 400
+        return ojson({"error": "OTP expired. Please sign up again."}, 400)
 
     if record["otp"] != otp:
-        return jsonify({"error": "Invalid OTP"}), 400
+        return ojson({"error": "Invalid OTP"}, 400)
 
-    users.insert_one({
-        "name": record["name"],
-        "contact": record["contact"],
-        "method": "email",
-        "password": record["password"],
-        "verified": True,
-        "image": DEFAULT_PROFILE_PIC,
-        "created_at": datetime.now(timezone.utc)
-    })
+    # The string form of _id is stored once so logins don't convert it
+    user_id = ObjectId()
+    try:
+        users.insert_one({
+            "_id": user_id,
+            "user_id": str(user_id),
+            "name": record["name"],
+            "contact": record["contact"],
+            "method": "email",
+            "password": record["password"],
+            "verified": True,
+            "image": DEFAULT_PROFILE_PIC,
+            "created_at": datetime.now(timezone.utc)
+        })
+    except DuplicateKeyError:
+        pending_users.delete_one({"contact": contact})
+        return ojson({"error": "User already exists"}, 400)
 
     pending_users.delete_one({"contact": contact})
-    return jsonify({"message": "Account verified successfully"}), 200
+    return ojson({"message": "Account verified successfully"}, 200)
 
 @app.route("/login", methods=["POST"])
 def login():
@@ -159,46 +333,45 @@ def login():
     contact = data.get("contact")
     password = data.get("password")
 
-    user = users.find_one({"contact": contact})
+    user = users.find_one(
+        {"contact": contact},
+        {"name": 1, "contact": 1, "password": 1, "image": 1, "user_id": 1},
+    )
     if not user:
-        return jsonify({"error": "User not found"}), 404
+        return ojson({"error": "User not found"}, 404)
 
-    if bcrypt.check_password_hash(user["password"], password):
-        return jsonify({
+    if HASH_POOL.submit(bcrypt.check_password_hash, user["password"], password).result():
+        return ojson({
             "message": "Login successful",
             "name": user.get("name"),
             "contact": user.get("contact"),
-            "userId": str(user.get("_id")),
+            "userId": user.get("user_id") or str(user["_id"]),
             "image": user.get("image", DEFAULT_PROFILE_PIC)
-        }), 200
+        }, 200)
 
-    return jsonify({"error": "Invalid password"}), 400
+    return ojson({"error": "Invalid password"}, 400)
 
 @app.route("/send-login-otp", methods=["POST"])
 def send_login_otp():
     data = request.get_json()
     contact = data.get("contact")
 
-    user = users.find_one({"contact": contact})
+    user = users.find_one({"contact": contact}, {"_id": 1})
     if not user:
-        return jsonify({"error": "User not found"}), 404
+        return ojson({"error": "User not found"}, 404)
 
-    otp = str(random.randint(100000, 999999))
+    otp = generate_otp()
     expiry = datetime.now(timezone.utc) + timedelta(minutes=5)
 
-    pending_users.delete_many({"contact": contact})
-    pending_users.insert_one({
+    save_pending_otp(contact, {
         "contact": contact,
         "otp": otp,
         "otp_expiry": expiry,
         "login_otp": True
     })
 
-    try:
-        send_email_otp(contact, otp)
-        return jsonify({"message": "Login OTP sent to email"}), 200
-    except Exception as e:
-        return jsonify({"error": f"Failed to send OTP: {str(e)}"}), 500
+    EMAIL_QUEUE.put((contact, otp, True))
+    return ojson({"message": "Login OTP sent to email"}, 200)
 
 @app.route("/verify-login-otp", methods=["POST"])
 def verify_login_otp():
@@ -206,9 +379,12 @@ def verify_login_otp():
     contact = data.get("contact")
     otp = data.get("otp")
 
-    record = pending_users.find_one({"contact": contact, "login_otp": True})
+    record = pending_users.find_one(
+        {"contact": contact, "login_otp": True},
+        {"otp": 1, "otp_expiry": 1},
+    )
     if not record:
-        return jsonify({"error": "No OTP login request found"}), 404
+        return ojson({"error": "No OTP login request found"}, 404)
 
     now = datetime.now(timezone.utc)
     otp_expiry = record["otp_expiry"]
@@ -217,111 +393,512 @@ def verify_login_otp():
 
     if now > otp_expiry:
         pending_users.delete_one({"contact": contact})
-        return jsonify({"error": "OTP expired"}), 400
+        return ojson({"error": "OTP expired"}, 400)
 
     if record["otp"] != otp:
-        return jsonify({"error": "Invalid OTP"}), 400
+        return ojson({"error": "Invalid OTP"}, 400)
 
-    user = users.find_one({"contact": contact})
+    user = users.find_one(
+        {"contact": contact},
+        {"name": 1, "contact": 1, "image": 1, "user_id": 1},
+    )
     pending_users.delete_one({"contact": contact})
 
-    return jsonify({
+    return ojson({
         "message": "Login successful",
         "name": user.get("name"),
         "contact": user.get("contact"),
-        "userId": str(user.get("_id")),
+        "userId": user.get("user_id") or str(user["_id"]),
         "image": user.get("image", DEFAULT_PROFILE_PIC)
-    }), 200
+    }, 200)
 
 # -------------------------------
 # EXCEL / CATALOG ROUTES
 # -------------------------------
-_cache = {"data": None, "timestamp": 0}
-CACHE_TTL = 10  # seconds
-
-def load_items_by_category():
-    global _cache
-    if _cache["data"] and (time.time() - _cache["timestamp"] < CACHE_TTL):
-        return _cache["data"]
-
-    if not EXCEL_PATH.exists():
-        print(f"Excel file not found at: {EXCEL_PATH}")
-        return {}
-
-    wb = openpyxl.load_workbook(EXCEL_PATH)
-    categories = {}
+_cache = {
+    "data": None,
+    "key": None,
+    "failed_key": None,
+    "items_by_id": {},
+    "category_list_json": b"[]",
+    "categories_json": b"{}",
+    "category_json": {},
+}
+PLACEHOLDER_THUMBNAIL = "https://via.placeholder.com/150"
+CACHE_DIR = BASE_DIR / ".cache"
+# Bump whenever _parse_workbook's output changes so pickles written by
+# older code are not served for an unchanged storage.xlsx
+CACHE_FORMAT = 4
+# Single-flights every parse (full catalog or single sheet) so concurrent
+# requests don't repeat each other's work; also guards _sheet_cache writes
+_cache_lock = threading.Lock()
+# sheet name -> (workbook key, items, encoded items) for sheets loaded on
+# their own before the full catalog was
+_sheet_cache = {}
+
+def _excel_cache_key():
+    # Changes whenever storage.xlsx is replaced or edited, or the parser's
+    # output changes (CACHE_FORMAT)
+    stat = EXCEL_PATH.stat()
+    return f"v{CACHE_FORMAT}-{stat.st_mtime_ns}-{stat.st_size}"
 
-    for sheet_name in wb.sheetnames:
-        sheet = wb[sheet_name]
-        items = []
-        for row in sheet.iter_rows(min_row=2, values_only=True):
-            if not any(row):
+# -------------------------------
+# Helper: streaming XLSX reader
+# -------------------------------
+# Reads cached cell values straight from the xlsx zip with iterparse, one
+# row at a time, without building per-cell objects. styles.xml is read only
+# to tell which cell styles are dates, so date cells come back as
+# datetimes as they did with openpyxl.
+_XLSX_MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_XLSX_PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+_XLSX_REL_ID = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id"
+_XLSX_DIMENSION = _XLSX_MAIN_NS + "dimension"
+_XLSX_SHEET_DATA = _XLSX_MAIN_NS + "sheetData"
+_XLSX_ROW = _XLSX_MAIN_NS + "row"
+_XLSX_CELL = _XLSX_MAIN_NS + "c"
+_XLSX_VALUE = _XLSX_MAIN_NS + "v"
+_XLSX_TEXT = _XLSX_MAIN_NS + "t"
+_XLSX_RUN = _XLSX_MAIN_NS + "r"
+_XLSX_SHARED_STRING = _XLSX_MAIN_NS + "si"
+# Built-in numFmtIds that are dates/times (46, "[h]:mm:ss", is a duration)
+_XLSX_BUILTIN_DATE_FORMATS = set(range(14, 23)) | {45, 47}
+# Quoted literals and [locale]/[color] sections, apart from [h]/[m]/[s]
+_XLSX_FORMAT_STRIP_RE = re.compile(r'".*?"|\[(?!hh?\]|mm?\]|ss?\])[^\]]*\]')
+_XLSX_DURATION_RE = re.compile(r"\[(hh?|mm?|ss?)\]", re.I)
+_XLSX_EPOCH_1900 = datetime(1899, 12, 30)
+_XLSX_EPOCH_1904 = datetime(1904, 1, 1)
+
+def _xlsx_part_path(target):
+    # Relationship targets are relative to xl/ unless absolute
+    if target.startswith("/"):
+        return target.lstrip("/")
+    return posixpath.normpath(posixpath.join("xl", target))
+
+def _xlsx_workbook(z):
+    """Return ([(sheet_name, part_path), ...], {part type: path}, date1904)."""
+    rels = ET.fromstring(z.read("xl/_rels/workbook.xml.rels"))
+    targets = {}
+    parts = {}
+    for rel in rels.iter(_XLSX_PKG_REL_NS + "Relationship"):
+        targets[rel.get("Id")] = _xlsx_part_path(rel.get("Target"))
+        parts[rel.get("Type", "").rsplit("/", 1)[-1]] = targets[rel.get("Id")]
+
+    workbook = ET.fromstring(z.read("xl/workbook.xml"))
+    sheets = [
+        (sheet.get("name"), targets[sheet.get(_XLSX_REL_ID)])
+        for sheet in workbook.iter(_XLSX_MAIN_NS + "sheet")
+    ]
+    props = workbook.find(_XLSX_MAIN_NS + "workbookPr")
+    date1904 = props is not None and props.get("date1904") in ("1", "true")
+    return sheets, parts, date1904
+
+def _xlsx_is_date_format(code):
+    # Same test openpyxl uses: any date/time letter outside literals
+    code = _XLSX_FORMAT_STRIP_RE.sub("", code.split(";")[0])
+    if _XLSX_DURATION_RE.search(code):
+        return False
+    return re.search(r"(?<![_\\])[dmhysDMHYS]", code) is not None
+
+def _xlsx_date_styles(z, path):
+    """Return the indexes of cell styles (the `s` attribute) that are dates."""
+    if path is None or path not in z.namelist():
+        return set()
+    styles = ET.fromstring(z.read(path))
+    date_formats = set(_XLSX_BUILTIN_DATE_FORMATS)
+    for fmt in styles.iter(_XLSX_MAIN_NS + "numFmt"):
+        fmt_id = int(fmt.get("numFmtId"))
+        if _xlsx_is_date_format(fmt.get("formatCode", "")):
+            date_formats.add(fmt_id)
+        else:
+            date_formats.discard(fmt_id)
+
+    cell_xfs = styles.find(_XLSX_MAIN_NS + "cellXfs")
+    if cell_xfs is None:
+        return set()
+    return {
+        index
+        for index, xf in enumerate(cell_xfs.iter(_XLSX_MAIN_NS + "xf"))
+        if int(xf.get("numFmtId", 0)) in date_formats
+    }
+
+def _xlsx_from_serial(value, date1904):
+    # Mirrors openpyxl.utils.datetime.from_excel (1900 leap-year bug included)
+    day, fraction = divmod(value, 1)
+    diff = timedelta(milliseconds=round(fraction * 86400 * 1000))
+    if date1904:
+        return _XLSX_EPOCH_1904 + timedelta(days=day) + diff
+    if 0 <= value < 1 and diff.days == 0:
+        return (datetime.min + diff).time()
+    if 0 < value < 60:
+        day += 1
+    return _XLSX_EPOCH_1900 + timedelta(days=day) + diff
+
+def _xlsx_text(el):
+    # Plain <t> or rich-text runs <r><t>; phonetic <rPh> runs are skipped
+    parts = []
+    for child in el:
+        if child.tag == _XLSX_TEXT:
+            parts.append(child.text or "")
+        elif child.tag == _XLSX_RUN:
+            t = child.find(_XLSX_TEXT)
+            if t is not None:
+                parts.append(t.text or "")
+    return "".join(parts)
+
+def _xlsx_shared_strings(z, path):
+    if path is None or path not in z.namelist():
+        return []
+    strings = []
+    root = None
+    with z.open(path) as f:
+        for event, el in ET.iterparse(f, events=("start", "end")):
+            if event == "start":
+                if root is None:
+                    root = el
+                continue
+            if el.tag == _XLSX_SHARED_STRING:
+                strings.append(_xlsx_text(el))
+                # Detach, not just clear: emptied <si>s would pile up under <sst>
+                root.remove(el)
+    return strings
+
+def _xlsx_column_index(ref):
+    # "C12" -> 2
+    index = 0
+    for ch in ref:
+        if not ch.isalpha():
+            break
+        index = index * 26 + (ord(ch.upper()) - 64)
+    return index - 1
+
+def _xlsx_number(text):
+    # openpyxl's rule: decimal point or exponent -> float, else int. Ints
+    # outside 64 bits stay floats, which orjson can encode.
+    if "." in text or "E" in text or "e" in text:
+        return float(text)
+    value = int(text)
+    if abs(value) >= 2**63:
+        return float(value)
+    return value
+
+def _xlsx_cell_value(c, book):
+    cell_type = c.get("t", "n")
+    if cell_type == "inlineStr":
+        inline = c.find(_XLSX_MAIN_NS + "is")
+        return _xlsx_text(inline) if inline is not None else ""
+    v = c.find(_XLSX_VALUE)
+    if v is None or v.text is None:
+        return None
+    if cell_type == "s":
+        return book["shared_strings"][int(v.text)]
+    if cell_type == "b":
+        return v.text == "1"
+    if cell_type == "d":
+        # ISO 8601 date, time or datetime cell
+        text = v.text
+        try:
+            if ":" not in text:
+                return date.fromisoformat(text)
+            if "-" in text:
+                return datetime.fromisoformat(text)
+            return dt_time.fromisoformat(text)
+        except ValueError:
+            return text
+    if cell_type in ("str", "e"):
+        return v.text
+    if int(c.get("s", 0)) in book["date_styles"]:
+        return _xlsx_from_serial(float(v.text), book["date1904"])
+    return _xlsx_number(v.text)
+
+def _xlsx_iter_rows(z, path, book, min_row=1):
+    """Yield each row at or below min_row as a list of cell values.
+
+    Rows are padded with None to the sheet's <dimension> width, as openpyxl
+    pads them to max_column.
+    """
+    row_number = 0
+    width = 0
+    sheet_data = None
+    with z.open(path) as f:
+        for event, el in ET.iterparse(f, events=("start", "end")):
+            if event == "start":
+                if el.tag == _XLSX_SHEET_DATA:
+                    sheet_data = el
                 continue
-            if len(row) < 2 or not row[0] or not row[1]:
+            if el.tag == _XLSX_DIMENSION:
+                last = el.get("ref", "").split(":")[-1]
+                if last[:1].isalpha():
+                    width = _xlsx_column_index(last) + 1
                 continue
-            unique_id = f"{sheet_name}_{row[0]}"
-            item = {
-                "id": unique_id,
-                "title": row[1],
-                "author": row[2] if len(row) > 2 else "",
-                "price": row[3] if len(row) > 3 else "",
-                "image": row[4] if len(row) > 4 and row[4] else "",
-                "category": sheet_name,
-                "image2": row[6] if len(row) > 6 and row[6] else "",
-                "image3": row[7] if len(row) > 7 and row[7] else "",
-                "description": row[8] if len(row) > 8 and row[8] else "",
-                "image4": row[9] if len(row) > 9 and row[9] else "",
-                "image5": row[10] if len(row) > 10 and row[10] else "",
-            }
+            if el.tag != _XLSX_ROW:
+                continue
+            row_number = int(el.get("r", row_number + 1))
+            if row_number >= min_row:
+                row = []
+                for c in el.iter(_XLSX_CELL):
+                    ref = c.get("r")
+                    col = _xlsx_column_index(ref) if ref else len(row)
+                    row.extend([None] * (col + 1 - len(row)))
+                    row[col] = _xlsx_cell_value(c, book)
+                row.extend([None] * (width - len(row)))
+                yield row
+            # Detach, not just clear: emptied <row>s would otherwise stay
+            # in <sheetData> and memory would grow with the row count
+            if sheet_data is not None:
+                sheet_data.remove(el)
+            else:
+                el.clear()
+
+def _row_to_item(sheet_name, row):
+    if not any(row):
+        return None
+    if len(row) < 2 or not row[0] or not row[1]:
+        return None
+
+    def value(i):
+        # Blank cells inside the row stay None (null), as with openpyxl
+        return row[i] if len(row) > i else ""
+
+    def optional(i):
+        return row[i] if len(row) > i and row[i] else ""
+
+    return {
+        "id": f"{sheet_name}_{row[0]}",
+        "title": row[1],
+        "author": value(2),
+        "price": value(3),
+        "image": optional(4),
+        "category": sheet_name,
+        "image2": optional(6),
+        "image3": optional(7),
+        "description": optional(8),
+        "image4": optional(9),
+        "image5": optional(10),
+    }
+
+def _parse_sheet(z, sheet_name, path, book):
+    items = []
+    # Row 1 is the header
+    for row in _xlsx_iter_rows(z, path, book, min_row=2):
+        item = _row_to_item(sheet_name, row)
+        if item:
             items.append(item)
-        categories[sheet_name] = items
+    return items
+
+def _parse_workbook(only_sheet=None):
+    """Parse every sheet, or just only_sheet (absent sheets are skipped)."""
+    categories = {}
+
+    with zipfile.ZipFile(EXCEL_PATH) as z:
+        sheets, parts, date1904 = _xlsx_workbook(z)
+        if only_sheet is not None:
+            sheets = [(name, path) for name, path in sheets if name == only_sheet]
+            if not sheets:
+                return categories
+        book = {
+            "shared_strings": _xlsx_shared_strings(z, parts.get("sharedStrings")),
+            "date_styles": _xlsx_date_styles(z, parts.get("styles")),
+            "date1904": date1904,
+        }
+        for sheet_name, path in sheets:
+            categories[sheet_name] = _parse_sheet(z, sheet_name, path, book)
 
-    _cache["data"] = categories
-    _cache["timestamp"] = time.time()
-    print(f"Loaded {len(categories)} categories from Excel.")
     return categories
 
-@app.route("/api/category-list")
-def get_category_list():
-    data = load_items_by_category()
-    category_list = []
-    for name, items in data.items():
-        thumbnail = ""
-        for item in items:
-            if item.get("image"):
-                thumbnail = item["image"]
-                break
-        category_list.append({
+def _read_disk_cache(key):
+    cache_file = CACHE_DIR / f"{key}.pkl"
+    try:
+        with open(cache_file, "rb") as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Ignoring unreadable Excel cache {cache_file}: {e}")
+        return None
+
+def _write_disk_cache(key, categories):
+    cache_file = CACHE_DIR / f"{key}.pkl"
+    try:
+        CACHE_DIR.mkdir(exist_ok=True)
+        tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_file, "wb") as f:
+            pickle.dump(categories, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, cache_file)
+        for old_file in CACHE_DIR.glob("*.pkl"):
+            if old_file != cache_file:
+                old_file.unlink(missing_ok=True)
+    except OSError as e:
+        print(f"Could not write Excel cache {cache_file}: {e}")
+
+def load_items_by_category():
+    try:
+        key = _excel_cache_key()
+    except FileNotFoundError:
+        print(f"Excel file not found at: {EXCEL_PATH}")
+        return _cache["data"] or {}
+
+    # Fast path, no lock: this workbook version is already loaded (or
+    # already failed to load and the previous catalog is being served)
+    if key in (_cache["key"], _cache["failed_key"]):
+        return _cache["data"]
+
+    with _cache_lock:
+        # Another request may have finished the reload while we waited
+        if key in (_cache["key"], _cache["failed_key"]):
+            return _cache["data"]
+
+        categories = None
+        from_disk = False
+        try:
+            categories = _read_disk_cache(key)
+            from_disk = categories is not None
+            if not from_disk:
+                categories = _parse_workbook()
+            new_cache = _build_cache(key, categories)
+        except Exception as e:
+            if from_disk:
+                # Don't let a pickle that can't be served outlive this process
+                (CACHE_DIR / f"{key}.pkl").unlink(missing_ok=True)
+            if _cache["data"] is None:
+                raise
+            print(f"Failed to reload Excel, serving previous catalog: {e}")
+            _cache["failed_key"] = key
+            return _cache["data"]
+
+        _publish_cache(new_cache)
+        if not from_disk:
+            # Only a catalog that published cleanly is persisted
+            _write_disk_cache(key, categories)
+            print(f"Loaded {len(categories)} categories from Excel.")
+        return categories
+
+def load_sheet(sheet_name):
+    """Return (items, encoded_items) for one sheet, or (None, None).
+
+    Served from the full catalog when it is current; otherwise only this
+    sheet is parsed and kept until the workbook changes. A full reload in
+    progress is waited for and its result served instead.
+    """
+    try:
+        key = _excel_cache_key()
+    except FileNotFoundError:
+        print(f"Excel file not found at: {EXCEL_PATH}")
+        key = None
+
+    cache = _cache  # one snapshot, in case a reload swaps _cache meanwhile
+    if key is None or key in (cache["key"], cache["failed_key"]):
+        return (cache["data"] or {}).get(sheet_name), cache["category_json"].get(sheet_name)
+
+    cached = _sheet_cache.get(sheet_name)
+    if cached and cached[0] == key:
+        return cached[1], cached[2]
+
+    with _cache_lock:
+        # A full load (e.g. the startup warm-up) may have finished while we
+        # waited, or another request may have parsed this sheet
+        cache = _cache
+        if key in (cache["key"], cache["failed_key"]):
+            return (cache["data"] or {}).get(sheet_name), cache["category_json"].get(sheet_name)
+        cached = _sheet_cache.get(sheet_name)
+        if cached and cached[0] == key:
+            return cached[1], cached[2]
+
+        try:
+            items = _parse_workbook(only_sheet=sheet_name).get(sheet_name)
+        except Exception as e:
+            if not cached:
+                raise
+            print(f"Failed to reload sheet '{sheet_name}', serving previous items: {e}")
+            return cached[1], cached[2]
+
+        if items is None:
+            # Unknown names aren't cached; the lookup only reads workbook.xml
+            return None, None
+        body = dump_json(items) if items else None
+        _sheet_cache[sheet_name] = (key, items, body)
+        return items, body
+
+def _build_cache(key, categories):
+    # Everything derived from the catalog is built once per workbook change,
+    # into a fresh dict so a failure part-way leaves _cache untouched
+    category_list = [
+        {
             "name": name,
             "count": len(items),
-            "thumbnail": thumbnail or "https://via.placeholder.com/150"
-        })
-    return jsonify(category_list)
+            "thumbnail": next(
+                (item["image"] for item in items if item.get("image")),
+                PLACEHOLDER_THUMBNAIL,
+            ),
+        }
+        for name, items in categories.items()
+    ]
+    # setdefault keeps the first row for a repeated id, as the old linear
+    # scan in get_item did
+    items_by_id = {}
+    for items in categories.values():
+        for item in items:
+            items_by_id.setdefault(item["id"], item)
+    return {
+        "data": categories,
+        "key": key,
+        "failed_key": None,
+        "items_by_id": items_by_id,
+        "category_list_json": dump_json(category_list),
+        "categories_json": dump_json(categories),
+        "category_json": {
+            name: dump_json(items) for name, items in categories.items() if items
+        },
+    }
+
+def _publish_cache(new_cache):
+    # Caller holds _cache_lock. Rebinding swaps every field at once, so the
+    # lock-free readers never see a mix of old and new catalog.
+    global _cache
+    _cache = new_cache
+    # Per-sheet entries are redundant once the whole catalog is loaded
+    _sheet_cache.clear()
+
+@app.route("/api/category-list")
+def get_category_list():
+    load_items_by_category()
+    return Response(_cache["category_list_json"], mimetype="application/json")
 
 @app.route("/api/categories")
 def get_categories():
-    return jsonify(load_items_by_category())
+    load_items_by_category()
+    return Response(_cache["categories_json"], mimetype="application/json")
 
 @app.route("/api/category/<path:category_name>")
 def get_category(category_name):
-    categories = load_items_by_category()
     category_name = unquote(category_name)
-    items = categories.get(category_name)
+    items, body = load_sheet(category_name)
     if not items:
-        return jsonify({"error": f"No items found for category '{category_name}'"}), 404
-    return jsonify(items)
+        return ojson({"error": f"No items found for category '{category_name}'"}, 404)
+    return Response(body, mimetype="application/json")
 
 @app.route("/api/item/<item_id>")
 def get_item(item_id):
-    categories = load_items_by_category()
-    for items in categories.values():
-        for item in items:
-            if item["id"] == item_id:
-                return jsonify(item)
-    return jsonify({"error": f"Item '{item_id}' not found"}), 404
+    load_items_by_category()
+    item = _cache["items_by_id"].get(item_id)
+    if item:
+        return ojson(item)
+    return ojson({"error": f"Item '{item_id}' not found"}, 404)
+
+# -------------------------------
+# Warm the catalog cache (background)
+# -------------------------------
+def warm_catalog_cache():
+    # Parsed at startup so no user request pays for the cold load
+    try:
+        load_items_by_category()
+    except Exception as e:
+        print(f"Failed to warm catalog cache: {e}")
+
+threading.Thread(target=warm_catalog_cache, daemon=True).start()
 
 # -------------------------------
-# Run
+# Run (local development only; production runs under
+# gunicorn with gunicorn.conf.py, see Procfile)
 # -------------------------------
 if __name__ == "__main__":
     print("Starting server")
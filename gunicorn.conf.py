@@ -0,0 +1,16 @@
+# gunicorn.conf.py
+import multiprocessing
+import os
+
+# -------------------------------
+# Workers
+# -------------------------------
+# Threaded workers: bcrypt releases the GIL and SMTP/MongoDB calls are I/O,
+# so one slow request no longer holds up the rest of its worker.
+worker_class = "gthread"
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+
+# app.py starts its email worker thread at import time; each worker must
+# import the app itself so that thread exists after the fork.
+preload_app = False
@@ -0,0 +1,158 @@
+# Parity tests: the streaming reader in app.py against openpyxl, which the
+# catalog loader originally used. Needs pytest and openpyxl, which are test
+# dependencies only (not in requirements.txt).
+import zipfile
+from datetime import date, datetime, time
+
+import pytest
+
+openpyxl = pytest.importorskip("openpyxl")
+from openpyxl.cell.rich_text import CellRichText, TextBlock
+from openpyxl.cell.text import InlineFont
+from openpyxl.utils.datetime import CALENDAR_MAC_1904
+
+import app
+
+HEADER = ["ID", "Title", "Author", "Price", "Image", "Category",
+          "Image2", "Image3", "Description", "Image4", "Image5"]
+
+
+def read_rows(path):
+    """Rows 2..N of every sheet as the app's reader sees them."""
+    with zipfile.ZipFile(path) as z:
+        sheets, parts, date1904 = app._xlsx_workbook(z)
+        book = {
+            "shared_strings": app._xlsx_shared_strings(z, parts.get("sharedStrings")),
+            "date_styles": app._xlsx_date_styles(z, parts.get("styles")),
+            "date1904": date1904,
+        }
+        return {
+            name: list(app._xlsx_iter_rows(z, sheet_path, book, min_row=2))
+            for name, sheet_path in sheets
+        }
+
+
+def openpyxl_rows(path):
+    wb = openpyxl.load_workbook(path)
+    return {
+        name: [list(row) for row in wb[name].iter_rows(min_row=2, values_only=True)]
+        for name in wb.sheetnames
+    }
+
+
+def openpyxl_items(path):
+    wb = openpyxl.load_workbook(path)
+    categories = {}
+    for name in wb.sheetnames:
+        items = []
+        for row in wb[name].iter_rows(min_row=2, values_only=True):
+            item = app._row_to_item(name, list(row))
+            if item:
+                items.append(item)
+        categories[name] = items
+    return categories
+
+
+def set_cell(ws, ref, value, number_format=None):
+    ws[ref] = value
+    if number_format:
+        ws[ref].number_format = number_format
+
+
+@pytest.fixture
+def fixture_workbook(tmp_path):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Formats"
+    ws.append(HEADER)
+
+    # Dates and times
+    ws.append([1, "dates", datetime(2024, 1, 1, 10, 30), date(1900, 2, 1), time(6, 15)])
+    set_cell(ws, "F2", 45000.5, "dd/mm/yyyy hh:mm")
+    set_cell(ws, "G2", 59, "yyyy-mm-dd")  # before Excel's fake 1900-02-29
+
+    # Number formats that must not be read as dates
+    ws.append([2, "formats"])
+    set_cell(ws, "C3", 0.125, "0.00%")
+    set_cell(ws, "D3", 7, '"Qty "0')
+    set_cell(ws, "E3", 3.5, '"d"0.0')
+    set_cell(ws, "F3", 12.5, "[Red]0.00")
+    set_cell(ws, "G3", 100, "#,##0")
+
+    # Blank cells inside and at the end of a row
+    ws.append([3, "blanks", None, None, "img", None, None, "img3"])
+
+    # Rich text, large and awkward numbers, booleans
+    ws.append([
+        4,
+        CellRichText([TextBlock(InlineFont(b=True), "Bold"), " plain"]),
+        1e20,
+        -2.5,
+        True,
+        0,
+        1.0,
+        "  spaced  ",
+    ])
+    wb.save(tmp_path / "formats.xlsx")
+    return tmp_path / "formats.xlsx"
+
+
+def test_rows_match_openpyxl(fixture_workbook):
+    assert read_rows(fixture_workbook) == openpyxl_rows(fixture_workbook)
+
+
+def test_items_match_openpyxl(fixture_workbook, monkeypatch):
+    monkeypatch.setattr(app, "EXCEL_PATH", fixture_workbook)
+    assert app._parse_workbook() == openpyxl_items(fixture_workbook)
+
+
+def test_storage_workbook_matches_openpyxl(monkeypatch):
+    monkeypatch.setattr(app, "EXCEL_PATH", app.BASE_DIR / "storage.xlsx")
+    assert app._parse_workbook() == openpyxl_items(app.EXCEL_PATH)
+
+
+def test_blank_author_and_price_are_null(fixture_workbook, monkeypatch):
+    monkeypatch.setattr(app, "EXCEL_PATH", fixture_workbook)
+    item = app._parse_workbook()["Formats"][2]
+    assert item["author"] is None
+    assert item["price"] is None
+
+
+def test_large_numbers_stay_floats_and_encode(fixture_workbook, monkeypatch):
+    monkeypatch.setattr(app, "EXCEL_PATH", fixture_workbook)
+    categories = app._parse_workbook()
+    assert categories["Formats"][3]["author"] == 1e20
+    assert isinstance(categories["Formats"][3]["author"], float)
+    app.dump_json(categories)
+    assert isinstance(app._xlsx_number("123456789012345678901234"), float)
+
+
+def test_1904_epoch(tmp_path):
+    wb = openpyxl.Workbook()
+    wb.epoch = CALENDAR_MAC_1904
+    ws = wb.active
+    ws.append(HEADER)
+    ws.append([1, "mac", datetime(2024, 3, 5, 8, 0), date(1904, 1, 2)])
+    wb.save(tmp_path / "mac.xlsx")
+    assert read_rows(tmp_path / "mac.xlsx") == openpyxl_rows(tmp_path / "mac.xlsx")
+
+
+def test_iso_date_cells(tmp_path):
+    wb = openpyxl.Workbook()
+    wb.iso_dates = True  # written as t="d" cells
+    ws = wb.active
+    ws.append(HEADER)
+    ws.append([1, "iso", datetime(2024, 1, 1, 0, 0), date(2024, 1, 2), time(9, 30)])
+    wb.save(tmp_path / "iso.xlsx")
+    assert read_rows(tmp_path / "iso.xlsx") == openpyxl_rows(tmp_path / "iso.xlsx")
+
+
+def test_duration_formats_stay_numbers(tmp_path):
+    # openpyxl returns a timedelta here, which jsonify could never encode
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(HEADER)
+    ws.append([1, "duration"])
+    set_cell(ws, "C2", 1.5, "[h]:mm:ss")
+    wb.save(tmp_path / "duration.xlsx")
+    assert read_rows(tmp_path / "duration.xlsx")["Sheet"][0][2] == 1.5